@@ -1,9 +1,13 @@
 import logging
 import asyncio
+import os
+import types
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Any, List, Mapping
 from dotenv import load_dotenv
 
+from livekit import rtc
 from livekit.agents import (
     Agent,
     AgentSession,
@@ -25,11 +29,109 @@ logger = logging.getLogger("appointment-agent")
 
 load_dotenv()
 
+# Every idle job process runs prewarm() and holds its own copy of the VAD and
+# turn-detector weights, so memory-constrained hosts can cap the pool size
+NUM_IDLE_PROCESSES = os.getenv("AGENT_NUM_IDLE_PROCESSES")
+
+# Default appointment details for testing
+# In production, these would be fetched from a database per call
+_DEFAULT_APPOINTMENT = types.MappingProxyType({
+    "date": "tomorrow at 2:30 PM",
+    "service": "dental cleaning",
+    "doctor": "Dr. Johnson",
+    "location": "Main Street Dental Clinic",
+    "patient_name": "there",  # Use "there" as fallback if no name
+})
+
+
+def _time_of_day(hour: int) -> str:
+    """Map an hour of the day to the greeting's time-of-day word."""
+    return "morning" if hour < 12 else "afternoon" if hour < 17 else "evening"
+
+
+def _tool_schema(
+    name: str,
+    description: str,
+    properties: Optional[Mapping[str, Any]] = None,
+    required: tuple = (),
+) -> Mapping[str, Any]:
+    """Build a raw function-tool schema in the OpenAI function-calling format."""
+    return {
+        "name": name,
+        "description": description,
+        "parameters": {
+            "type": "object",
+            "properties": dict(properties or {}),
+            "required": list(required),
+            "additionalProperties": False,
+        },
+    }
+
+
+# Tool schemas, written out once at import. For tools declared from their
+# signature, livekit rebuilds the JSON schema (inspect, type hints, docstring
+# parsing and a pydantic model) on every LLM request; raw_schema tools send
+# these dicts as they are.
+_CONFIRM_APPOINTMENT_SCHEMA = _tool_schema(
+    "confirm_appointment",
+    "Called when the customer confirms they can make their appointment. "
+    "This tool is triggered by affirmative responses like \"yes\", "
+    "\"I'll be there\", \"confirmed\", etc.",
+)
+_RESCHEDULE_SCHEMA = _tool_schema(
+    "handle_reschedule_request",
+    "Called when the customer needs to reschedule their appointment. "
+    "This tool is triggered by responses indicating they can't make it or "
+    "need a different time.",
+)
+_CANCELLATION_SCHEMA = _tool_schema(
+    "handle_cancellation",
+    "Called when the customer wants to cancel their appointment. "
+    "This tool is triggered by clear cancellation requests.",
+)
+_CLARIFY_SCHEMA = _tool_schema(
+    "clarify_appointment_details",
+    "Called when the customer asks for clarification about appointment details.",
+    properties={
+        "detail_type": {
+            "type": "string",
+            "description": "What they're asking about (time, location, service, etc.)",
+        },
+    },
+    required=("detail_type",),
+)
+_WRONG_PERSON_SCHEMA = _tool_schema(
+    "handle_wrong_person",
+    "Called when the person who answered isn't the patient.",
+    properties={
+        "requested_person": {
+            "type": "string",
+            "description": "Name of the person they say we should speak to",
+        },
+    },
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SessionConfig:
+    """Receptionist voice pipeline, built once per worker process in prewarm()."""
+    vad: silero.VAD
+    stt: deepgram.STT
+    llm: openai.LLM
+    tts: openai.TTS
+    turn_detection: MultilingualModel
+
+
+async def _replay(frames: List[rtc.AudioFrame]) -> AsyncIterator[rtc.AudioFrame]:
+    """Feed pre-synthesized audio frames to session.say()."""
+    for frame in frames:
+        yield frame
+
 
 class AppointmentConfirmationAgent(Agent):
     """Professional receptionist agent for appointment confirmations."""
     
-    def __init__(self, appointment_details: Optional[Dict[str, Any]] = None) -> None:
+    def __init__(self, appointment_details: Optional[Mapping[str, Any]] = None) -> None:
         super().__init__(
             instructions="""You are a polite, professional, yet warm-sounding receptionist named Sarah. 
             Your job is to call customers who already have booked appointments to check if they are 
@@ -59,47 +161,77 @@ class AppointmentConfirmationAgent(Agent):
             Remember: You're a human receptionist, not a robot. Be natural, be helpful, be persistent."""
         )
         
-        # Default appointment details for testing
-        # In production, this would be passed in or fetched from a database
-        self.appointment_details = appointment_details or {
-            "date": "tomorrow at 2:30 PM",
-            "service": "dental cleaning",
-            "doctor": "Dr. Johnson",
-            "location": "Main Street Dental Clinic",
-            "patient_name": "there",  # Use "there" as fallback if no name
-        }
+        # Fall back to the shared read-only defaults when no details are given
+        self.appointment_details = appointment_details or _DEFAULT_APPOINTMENT
         
         # Track conversation state
         self.confirmation_status = None  # Will be 'confirmed', 'rescheduled', 'cancelled'
         self.clarification_attempts = 0
+        
+        # Pre-render everything that only depends on the appointment details,
+        # so the first utterance and tool replies don't format strings per call
+        details = self.appointment_details
+        greeting_body = f"""This is Sarah calling from {details['location']}. 
+        I'm calling to confirm your appointment with {details['doctor']} 
+        {details['date']} for your {details['service']}. 
+        Are you still able to make it?"""
+        # Greetings are split into a short opener and the body so TTS playback
+        # of the opener can start while the body is still being synthesized
+        self._greetings = {
+            time_of_day: (f"Good {time_of_day}!", greeting_body)
+            for time_of_day in ("morning", "afternoon", "evening")
+        }
+        date_reply = f"Your appointment is scheduled for {details['date']}."
+        self._clarifications = {
+            "time": date_reply,
+            "date": date_reply,
+            "location": f"The appointment is at {details['location']}.",
+            "service": f"You're scheduled for a {details['service']} with {details['doctor']}.",
+            "doctor": f"Your appointment is with {details['doctor']}.",
+            "all": (
+                f"Let me confirm all the details for you. You have a {details['service']} "
+                f"with {details['doctor']} at {details['location']} "
+                f"{details['date']}."
+            ),
+        }
+
+    async def _synthesize(self, text: str) -> List[rtc.AudioFrame]:
+        """Synthesize text with the session's TTS ahead of playback."""
+        async with self.session.tts.synthesize(text) as stream:
+            return [chunk.frame async for chunk in stream]
 
     async def on_enter(self):
         """Called when agent first joins the call."""
-        # Small delay to simulate picking up the phone naturally
-        await asyncio.sleep(0.8)
-        
         # Get time of day for natural greeting
-        hour = datetime.now().hour
-        time_of_day = "morning" if hour < 12 else "afternoon" if hour < 17 else "evening"
+        time_of_day = _time_of_day(datetime.now().hour)
         
-        # Generate initial greeting with appointment details
-        greeting = f"""Good {time_of_day}! This is Sarah calling from {self.appointment_details['location']}. 
-        I'm calling to confirm your appointment with {self.appointment_details['doctor']} 
-        {self.appointment_details['date']} for your {self.appointment_details['service']}. 
-        Are you still able to make it?"""
+        # Pick the greeting pre-rendered with the appointment details
+        opener, greeting = self._greetings[time_of_day]
+        
+        # Synthesize the greeting during the pickup delay instead of after it
+        opener_audio = asyncio.create_task(self._synthesize(opener))
+        greeting_audio = asyncio.create_task(self._synthesize(greeting))
         
-        # Use the session to speak the greeting
-        await self.session.say(greeting)
+        try:
+            # Small delay to simulate picking up the phone naturally
+            await asyncio.sleep(0.8)
+            
+            # Queue the opener without waiting so it plays while the body finishes
+            # synthesizing; speech handles play out in the order they are queued
+            self.session.say(opener, audio=_replay(await opener_audio), allow_interruptions=False)
+            await self.session.say(greeting, audio=_replay(await greeting_audio))
+        finally:
+            # If the greeting was cancelled or failed, stop any synthesis still
+            # running and reap both tasks so neither is left unawaited
+            opener_audio.cancel()
+            greeting_audio.cancel()
+            await asyncio.gather(opener_audio, greeting_audio, return_exceptions=True)
 
-    @function_tool
+    @function_tool(raw_schema=_CONFIRM_APPOINTMENT_SCHEMA)
     async def confirm_appointment(
-        self, context: RunContext
+        self, raw_arguments: Mapping[str, Any], context: RunContext
     ) -> str:
-        """Called when the customer confirms they can make their appointment.
-        
-        This tool is triggered by affirmative responses like "yes", "I'll be there", 
-        "confirmed", etc.
-        """
+        """Called when the customer confirms they can make their appointment."""
         logger.info("Appointment confirmed")
         self.confirmation_status = "confirmed"
         
@@ -109,15 +241,11 @@ class AppointmentConfirmationAgent(Agent):
             "Thank you so much, and have a wonderful rest of your day!"
         )
 
-    @function_tool
+    @function_tool(raw_schema=_RESCHEDULE_SCHEMA)
     async def handle_reschedule_request(
-        self, context: RunContext
+        self, raw_arguments: Mapping[str, Any], context: RunContext
     ) -> str:
-        """Called when the customer needs to reschedule their appointment.
-        
-        This tool is triggered by responses indicating they can't make it or 
-        need a different time.
-        """
+        """Called when the customer needs to reschedule their appointment."""
         logger.info("Customer requesting reschedule")
         self.confirmation_status = "rescheduled"
         
@@ -127,14 +255,11 @@ class AppointmentConfirmationAgent(Agent):
             "or would you prefer to call back when you know your schedule better?"
         )
 
-    @function_tool
+    @function_tool(raw_schema=_CANCELLATION_SCHEMA)
     async def handle_cancellation(
-        self, context: RunContext
+        self, raw_arguments: Mapping[str, Any], context: RunContext
     ) -> str:
-        """Called when the customer wants to cancel their appointment.
-        
-        This tool is triggered by clear cancellation requests.
-        """
+        """Called when the customer wants to cancel their appointment."""
         logger.info("Customer requesting cancellation")
         self.confirmation_status = "cancelled"
         
@@ -144,50 +269,29 @@ class AppointmentConfirmationAgent(Agent):
             "another time, or would you prefer to call us back when you're ready?"
         )
 
-    @function_tool
+    @function_tool(raw_schema=_CLARIFY_SCHEMA)
     async def clarify_appointment_details(
-        self, context: RunContext,
-        detail_type: str
+        self, raw_arguments: Mapping[str, Any], context: RunContext
     ) -> str:
-        """Called when the customer asks for clarification about appointment details.
+        """Called when the customer asks for clarification about appointment details."""
+        detail_type = raw_arguments.get("detail_type", "all")
+        logger.info("Clarifying %s", detail_type)
         
-        Args:
-            detail_type: What they're asking about (time, location, service, etc.)
-        """
-        logger.info(f"Clarifying {detail_type}")
-        
-        if detail_type == "time" or detail_type == "date":
-            return f"Your appointment is scheduled for {self.appointment_details['date']}."
-        elif detail_type == "location":
-            return f"The appointment is at {self.appointment_details['location']}."
-        elif detail_type == "service":
-            return f"You're scheduled for a {self.appointment_details['service']} with {self.appointment_details['doctor']}."
-        elif detail_type == "doctor":
-            return f"Your appointment is with {self.appointment_details['doctor']}."
-        else:
-            # Provide all details
-            return (
-                f"Let me confirm all the details for you. You have a {self.appointment_details['service']} "
-                f"with {self.appointment_details['doctor']} at {self.appointment_details['location']} "
-                f"{self.appointment_details['date']}."
-            )
+        # Unknown detail types fall back to providing all details
+        return self._clarifications.get(detail_type, self._clarifications["all"])
 
-    @function_tool
+    @function_tool(raw_schema=_WRONG_PERSON_SCHEMA)
     async def handle_wrong_person(
-        self, context: RunContext,
-        requested_person: Optional[str] = None
+        self, raw_arguments: Mapping[str, Any], context: RunContext
     ) -> str:
-        """Called when the person who answered isn't the patient.
-        
-        Args:
-            requested_person: Name of the person they say we should speak to
-        """
-        logger.info(f"Wrong person answered, looking for: {requested_person}")
+        """Called when the person who answered isn't the patient."""
+        requested_person = raw_arguments.get("requested_person")
+        logger.info("Wrong person answered, looking for: %s", requested_person)
         
         if requested_person:
             return (
                 f"Oh, I apologize! I'm looking for {requested_person}. "
-                "This is Sarah from {self.appointment_details['location']} calling about "
+                f"This is Sarah from {self.appointment_details['location']} calling about "
                 "their appointment tomorrow. Are they available?"
             )
         else:
@@ -200,8 +304,28 @@ class AppointmentConfirmationAgent(Agent):
 
 def prewarm(proc: JobProcess):
     """Preload heavy resources before job assignment."""
-    proc.userdata["vad"] = silero.VAD.load()
-    logger.info("VAD model preloaded")
+    proc.userdata["session_cfg"] = SessionConfig(
+        vad=silero.VAD.load(),
+        stt=deepgram.STT(
+            model="nova-3",
+            language="multi",  # Multi-language support
+            smart_format=True,  # Better formatting of numbers, dates
+            punctuate=True,
+            # Only discrete tool calls act on speech, so partial transcripts
+            # just add event-loop wake-ups; VAD still drives barge-in
+            interim_results=False,
+        ),
+        llm=openai.LLM(
+            model="gpt-4o-mini",
+            temperature=0.8,  # Higher for more natural variation
+        ),
+        tts=openai.TTS(
+            voice="nova",  # Most natural female voice
+            speed=1.0,  # Normal speaking pace
+        ),
+        turn_detection=MultilingualModel(),
+    )
+    logger.info("VAD, turn detector, STT, LLM and TTS preloaded")
 
 
 async def entrypoint(ctx: JobContext):
@@ -213,37 +337,20 @@ async def entrypoint(ctx: JobContext):
     
     # Connect to the room first
     await ctx.connect()
-    logger.info(f"Connected to room: {ctx.room.name}")
+    logger.info("Connected to room: %s", ctx.room.name)
 
     # In production, you might fetch appointment details from a database
     # based on room metadata or participant identity
-    appointment_details = {
-        "date": "tomorrow at 2:30 PM",
-        "service": "dental cleaning", 
-        "doctor": "Dr. Johnson",
-        "location": "Main Street Dental Clinic",
-        "patient_name": "there",  # Would be actual name in production
-    }
+    appointment_details = _DEFAULT_APPOINTMENT
 
-    # Create agent session with voice pipeline
+    # Create agent session with the voice pipeline preloaded in prewarm()
+    cfg = ctx.proc.userdata["session_cfg"]
     session = AgentSession(
-        vad=ctx.proc.userdata["vad"],
-        stt=deepgram.STT(
-            model="nova-3",
-            language="multi",  # Multi-language support
-            smart_format=True,  # Better formatting of numbers, dates
-            punctuate=True,
-            interim_results=True,  # For better perceived responsiveness
-        ),
-        llm=openai.LLM(
-            model="gpt-4o-mini",
-            temperature=0.8,  # Higher for more natural variation
-        ),
-        tts=openai.TTS(
-            voice="nova",  # Most natural female voice
-            speed=1.0,  # Normal speaking pace
-        ),
-        turn_detection=MultilingualModel(),
+        vad=cfg.vad,
+        stt=cfg.stt,
+        llm=cfg.llm,
+        tts=cfg.tts,
+        turn_detection=cfg.turn_detection,
     )
 
     # Set up metrics collection
@@ -257,14 +364,15 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         """Log usage summary on shutdown."""
         summary = usage_collector.get_summary()
-        logger.info(f"Usage summary: {summary}")
+        logger.info("Usage summary: %s", summary)
 
     ctx.add_shutdown_callback(log_usage)
 
     # Log function tool usage
     @session.on("function_called")
     def on_function_called(ev):
-        logger.info(f"Tool called: {ev.function_name} with args: {ev.arguments}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Tool called: %s with args: %r", ev.function_name, ev.arguments)
 
     # Start the session
     agent = AppointmentConfirmationAgent(appointment_details)
@@ -281,11 +389,14 @@ async def entrypoint(ctx: JobContext):
     )
 
     # Log final status
-    logger.info(f"Call completed. Status: {agent.confirmation_status}")
+    logger.info("Call completed. Status: %s", agent.confirmation_status)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(
+    worker_options = WorkerOptions(
         entrypoint_fnc=entrypoint,
         prewarm_fnc=prewarm
-    ))
\ No newline at end of file
+    )
+    if NUM_IDLE_PROCESSES is not None:
+        worker_options.num_idle_processes = int(NUM_IDLE_PROCESSES)
+    cli.run_app(worker_options)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import logging
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
 from livekit.agents import (
@@ -23,6 +24,16 @@ logger = logging.getLogger("basic-agent")
 load_dotenv()
 
 
+@dataclass(frozen=True, slots=True)
+class SessionConfig:
+    """Plugins for Kelly's sessions, loaded by prewarm()."""
+    vad: silero.VAD
+    stt: deepgram.STT
+    llm: openai.LLM
+    tts: openai.TTS
+    turn_detection: MultilingualModel
+
+
 class MyAgent(Agent):
     def __init__(self) -> None:
         super().__init__(
@@ -48,7 +59,7 @@ class MyAgent(Agent):
             latitude: The latitude of the location
             longitude: The longitude of the location
         """
-        logger.info(f"Looking up weather for {location} ({latitude}, {longitude})")
+        logger.info("Looking up weather for %s (%s, %s)", location, latitude, longitude)
         
         # In production, call actual weather API
         temperature = 72
@@ -66,7 +77,7 @@ class MyAgent(Agent):
             reminder: What to remind the user about
             time: When to remind them (e.g., "in 5 minutes", "tomorrow at 3pm")
         """
-        logger.info(f"Setting reminder: {reminder} at {time}")
+        logger.info("Setting reminder: %s at %s", reminder, time)
         
         # In production, integrate with reminder system
         return f"I've set a reminder to {reminder} {time}."
@@ -74,8 +85,24 @@ class MyAgent(Agent):
 
 def prewarm(proc: JobProcess):
     """Preload heavy resources before job assignment."""
-    proc.userdata["vad"] = silero.VAD.load()
-    logger.info("VAD model preloaded")
+    proc.userdata["session_cfg"] = SessionConfig(
+        vad=silero.VAD.load(),
+        stt=deepgram.STT(
+            model="nova-3",
+            language="multi",  # Multi-language support
+            interim_results=False,  # Final transcripts only
+        ),
+        llm=openai.LLM(
+            model="gpt-4o-mini",
+            temperature=0.8
+        ),
+        tts=openai.TTS(
+            voice="alloy",
+            speed=1.0
+        ),
+        turn_detection=MultilingualModel(),
+    )
+    logger.info("VAD, turn detector, STT, LLM and TTS preloaded")
 
 
 async def entrypoint(ctx: JobContext):
@@ -87,24 +114,16 @@ async def entrypoint(ctx: JobContext):
     
     # Connect to the room first
     await ctx.connect()
-    logger.info(f"Connected to room: {ctx.room.name}")
+    logger.info("Connected to room: %s", ctx.room.name)
 
-    # Create agent session with voice pipeline
+    # Create agent session with the voice pipeline preloaded in prewarm()
+    cfg = ctx.proc.userdata["session_cfg"]
     session = AgentSession(
-        vad=ctx.proc.userdata["vad"],
-        stt=deepgram.STT(
-            model="nova-3",
-            language="multi"  # Multi-language support
-        ),
-        llm=openai.LLM(
-            model="gpt-4o-mini",
-            temperature=0.8
-        ),
-        tts=openai.TTS(
-            voice="alloy",
-            speed=1.0
-        ),
-        turn_detection=MultilingualModel(),
+        vad=cfg.vad,
+        stt=cfg.stt,
+        llm=cfg.llm,
+        tts=cfg.tts,
+        turn_detection=cfg.turn_detection,
     )
 
     # Set up metrics collection
@@ -118,7 +137,7 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         """Log usage summary on shutdown."""
         summary = usage_collector.get_summary()
-        logger.info(f"Usage summary: {summary}")
+        logger.info("Usage summary: %s", summary)
 
     ctx.add_shutdown_callback(log_usage)
 
@@ -1,7 +1,10 @@
 import logging
+import re
 from dataclasses import dataclass
 from typing import Optional
+import httpx
 from dotenv import load_dotenv
+from openai import AsyncOpenAI
 
 from livekit import api
 from livekit.agents import (
@@ -26,10 +29,25 @@ logger = logging.getLogger("multi-agent")
 
 load_dotenv()
 
+# Routing keywords per specialist, scanned in a single pass over the issue text.
+# Word boundaries keep e.g. "chargeback" or "debugging" from matching, so
+# each keyword lists its inflections ("charged", "payments", "errors", ...).
+_ROUTE_PATTERN = re.compile(
+    r"\b(?P<billing>billing|payments?|invoices?|charge[sd]?)\b"
+    r"|\b(?P<technical>technical|errors?|bugs?|not\s+working)\b",
+    re.IGNORECASE,
+)
+
+# Specialist categories in priority order when an issue matches several
+_ROUTE_PRIORITY = ("billing", "technical")
 
-@dataclass
+
+@dataclass(slots=True)
 class CustomerData:
-    """Shared data between agents."""
+    """Shared data between agents.
+
+    Uses slots so each session's state carries no per-instance ``__dict__``.
+    """
     name: Optional[str] = None
     account_number: Optional[str] = None
     issue_type: Optional[str] = None
@@ -37,6 +55,15 @@ class CustomerData:
     interaction_count: int = 0
 
 
+@dataclass(frozen=True, slots=True)
+class SessionConfig:
+    """Plugins the intake and specialist agents share across handoffs."""
+    vad: silero.VAD
+    stt: deepgram.STT
+    llm: openai.LLM
+    tts: openai.TTS
+
+
 class IntakeAgent(Agent):
     """Initial agent that greets customers and gathers information."""
     
@@ -69,7 +96,7 @@ class IntakeAgent(Agent):
         context.userdata.issue_type = issue
         context.userdata.interaction_count += 1
         
-        logger.info(f"Customer info collected: {name}, Issue: {issue}")
+        logger.info("Customer info collected: %s, Issue: %s", name, issue)
         
         return f"Thank you {name}, I understand you need help with {issue}."
 
@@ -85,17 +112,12 @@ class IntakeAgent(Agent):
             return "I need to understand your issue first before routing you."
         
         # Determine routing based on issue type
-        if any(word in issue.lower() for word in ["billing", "payment", "invoice", "charge"]):
-            logger.info("Routing to billing specialist")
-            return "I'll connect you with our billing specialist", BillingAgent(chat_ctx=self.chat_ctx)
+        hits = {m.lastgroup for m in _ROUTE_PATTERN.finditer(issue)}
+        category = next((cat for cat in _ROUTE_PRIORITY if cat in hits), "general")
         
-        elif any(word in issue.lower() for word in ["technical", "error", "bug", "not working"]):
-            logger.info("Routing to technical support")
-            return "I'll connect you with technical support", TechnicalAgent(chat_ctx=self.chat_ctx)
-        
-        else:
-            logger.info("Routing to general support")
-            return "I'll connect you with a general support specialist", GeneralAgent(chat_ctx=self.chat_ctx)
+        specialist, announcement = _SPECIALISTS[category]
+        logger.info("Routing to %s support", category)
+        return announcement, specialist(chat_ctx=self.chat_ctx)
 
 
 class BillingAgent(Agent):
@@ -137,7 +159,7 @@ class BillingAgent(Agent):
             amount: Refund amount
             reason: Reason for refund
         """
-        logger.info(f"Processing refund: ${amount} for {reason}")
+        logger.info("Processing refund: $%s for %s", amount, reason)
         # Mock implementation
         return f"I've processed a refund of ${amount:.2f} for {reason}. It will appear in 3-5 business days."
 
@@ -177,7 +199,7 @@ class TechnicalAgent(Agent):
         Args:
             system: System to diagnose
         """
-        logger.info(f"Running diagnostics on {system}")
+        logger.info("Running diagnostics on %s", system)
         # Mock implementation
         return f"Diagnostics complete for {system}. Found 2 minor issues that can be auto-resolved."
 
@@ -241,7 +263,7 @@ class ManagerAgent(Agent):
         Args:
             request: Description of the exception
         """
-        logger.info(f"Manager approving exception: {request}")
+        logger.info("Manager approving exception: %s", request)
         return f"I've approved your request for {request}. This is a one-time exception."
 
     @function_tool
@@ -260,19 +282,44 @@ class ManagerAgent(Agent):
         await job_ctx.api.room.delete_room(api.DeleteRoomRequest(room=job_ctx.room.name))
 
 
+# Specialist agent and handoff announcement for each routing category
+_SPECIALISTS = {
+    "billing": (BillingAgent, "I'll connect you with our billing specialist"),
+    "technical": (TechnicalAgent, "I'll connect you with technical support"),
+    "general": (GeneralAgent, "I'll connect you with a general support specialist"),
+}
+
+
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    # One pooled HTTP/2 client, so LLM requests from every specialist after a
+    # handoff are multiplexed over a warm connection instead of new handshakes
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=httpx.Timeout(60.0, connect=2.0),
+    )
+    proc.userdata["http_client"] = http_client
+    proc.userdata["session_cfg"] = SessionConfig(
+        vad=silero.VAD.load(),
+        stt=deepgram.STT(model="nova-3"),
+        llm=openai.LLM(
+            model="gpt-4o-mini",
+            client=AsyncOpenAI(http_client=http_client),
+        ),
+        tts=openai.TTS(voice="echo"),  # Professional voice
+    )
 
 
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
     
     # Create session with shared customer data
+    cfg = ctx.proc.userdata["session_cfg"]
     session = AgentSession[CustomerData](
-        vad=ctx.proc.userdata["vad"],
-        stt=deepgram.STT(model="nova-3"),
-        llm=openai.LLM(model="gpt-4o-mini"),
-        tts=openai.TTS(voice="echo"),  # Professional voice
+        vad=cfg.vad,
+        stt=cfg.stt,
+        llm=cfg.llm,
+        tts=cfg.tts,
         userdata=CustomerData(),  # Shared state
     )
     
@@ -287,15 +334,19 @@ async def entrypoint(ctx: JobContext):
     # Log agent transitions
     @session.on("agent_updated")
     def on_agent_updated(agent):
-        logger.info(f"Agent transitioned to: {type(agent).__name__}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Agent transitioned to: %s", type(agent).__name__)
     
     # Shutdown logging
     async def log_usage():
         summary = usage_collector.get_summary()
-        logger.info(f"Session summary: {summary}")
-        logger.info(f"Total interactions: {session.userdata.interaction_count}")
+        logger.info("Session summary: %s", summary)
+        logger.info("Total interactions: %s", session.userdata.interaction_count)
     
     ctx.add_shutdown_callback(log_usage)
+    # A job process runs a single job, so its shutdown is the process's too;
+    # close the prewarmed HTTP client's pooled connections with it
+    ctx.add_shutdown_callback(ctx.proc.userdata["http_client"].aclose)
     
     # Start with intake agent
     await session.start(
@@ -1,4 +1,5 @@
 import logging
+import random
 from dotenv import load_dotenv
 
 from livekit.agents import (
@@ -18,6 +19,14 @@ logger = logging.getLogger("realtime-agent")
 
 load_dotenv()
 
+_JOKES = (
+    "Why don't scientists trust atoms? Because they make up everything!",
+    "What do you call a bear with no teeth? A gummy bear!",
+    "Why did the scarecrow win an award? He was outstanding in his field!",
+)
+
+_rng = random.Random()
+
 
 class RealtimeAgent(Agent):
     def __init__(self):
@@ -63,14 +72,7 @@ class RealtimeAgent(Agent):
     @function_tool
     async def tell_joke(self, context: RunContext) -> str:
         """Tell a funny joke to the user."""
-        jokes = [
-            "Why don't scientists trust atoms? Because they make up everything!",
-            "What do you call a bear with no teeth? A gummy bear!",
-            "Why did the scarecrow win an award? He was outstanding in his field!",
-        ]
-        
-        import random
-        return random.choice(jokes)
+        return _rng.choice(_JOKES)
 
 
 async def entrypoint(ctx: JobContext):
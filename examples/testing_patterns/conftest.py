@@ -0,0 +1,267 @@
+"""
+Shared pytest configuration for the LiveKit agent test patterns.
+
+Tests marked ``llm`` spend almost all of their time waiting on OpenAI round
+trips, so they are skipped by default. Pass ``--run-llm`` (or select them with
+``-m``) to include them, and shard the run across processes with pytest-xdist:
+
+    pytest -n auto --dist=loadscope --run-llm examples/testing_patterns/
+
+LLM responses are recorded to a local SQLite cache and replayed on later runs.
+This covers the ``judge()`` calls too: a judgment on the same (intent, message)
+pair is an identical request and is served from the cache. Keys include the
+livekit-agents version, so upgrading the harness (and its judge prompts)
+starts a fresh cache. Control it with ``LLM_CACHE``:
+
+    record  replay cached responses, call the API and record on a miss (default)
+    replay  replay cached responses only, fail on a miss (use in CI)
+    off     always call the live API
+
+Per-test durations are recorded with pytest-split's ``--store-durations``
+(written to ``.test_durations``). When that file exists, tests are ordered
+longest first so the slow multi-turn tests start early on each xdist worker
+instead of straggling at the end; CI can also shard on it with
+``--splits N --group i``.
+
+Benchmarks (``test_benchmarks.py``) are skipped too unless ``--benchmark-only``
+(or a ``-m`` expression) is given, so the default run stays fast.
+
+Pass ``--profile`` to run each process (the controller and every xdist
+worker) under cProfile and write its stats to ``.prof/<pid>.prof``; inspect
+them with ``snakeviz .prof/<pid>.prof`` or ``python -m pstats``.
+
+Every async test runs on one session-scoped event loop, so loop setup is paid
+once per worker and the session-scoped ``test_llm`` client (and its HTTPS
+connection pool) can be shared by every test. Tests must not close the loop.
+"""
+
+import cProfile
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import pytest
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+
+from livekit.agents import AgentSession, __version__ as livekit_agents_version
+from livekit.plugins import openai
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE", "record")
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", ".llm_cache.db"))
+
+
+PROFILE_DIR = Path(".prof")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-llm",
+        action="store_true",
+        default=False,
+        help="run the tests marked llm, which call the live OpenAI API",
+    )
+    parser.addoption(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="profile the run with cProfile and dump stats to .prof/<pid>.prof",
+    )
+
+
+def pytest_configure(config):
+    """Register the custom markers and start the profiler if requested."""
+    config.addinivalue_line(
+        "markers", "llm: test makes live calls to the OpenAI API"
+    )
+    
+    if config.getoption("--profile"):
+        config._profiler = cProfile.Profile()
+        config._profiler.enable()
+
+
+def pytest_unconfigure(config):
+    """Stop the profiler and dump this process's stats."""
+    profiler = getattr(config, "_profiler", None)
+    if profiler is None:
+        return
+    
+    profiler.disable()
+    PROFILE_DIR.mkdir(exist_ok=True)
+    profiler.dump_stats(PROFILE_DIR / f"{os.getpid()}.prof")
+
+
+def load_durations(config) -> dict:
+    """Read the per-test durations recorded by ``pytest --store-durations``."""
+    path = Path(config.getoption("durations_path", config.rootpath / ".test_durations"))
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def pytest_collection_modifyitems(config, items):
+    """Order tests longest first, run async ones on the session loop, skip llm and benchmark tests unless asked."""
+    durations = load_durations(config)
+    if durations:
+        # Stable sort, so tests without a recorded duration keep their order
+        items.sort(key=lambda item: durations.get(item.nodeid, 0.0), reverse=True)
+    
+    # An explicit -m expression decides for itself which llm tests to run
+    skip_llm = not (config.getoption("--run-llm") or config.getoption("markexpr"))
+    skip_marker = pytest.mark.skip(reason="calls the live LLM API; pass --run-llm to run")
+    # Benchmarks repeat each call thousands of times; they only run on request
+    skip_benchmarks = not (
+        config.getoption("benchmark_only", False) or config.getoption("markexpr")
+    )
+    skip_benchmark_marker = pytest.mark.skip(reason="benchmark; pass --benchmark-only to run")
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+        if skip_llm and "llm" in item.keywords:
+            item.add_marker(skip_marker)
+        if skip_benchmarks and "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark_marker)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    """Size ``-n auto`` to all but two cores, leaving headroom for the foreground."""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+class LLMResponseCache:
+    """SQLite-backed record/replay store for HTTP responses."""
+    
+    def __init__(self, path: Path):
+        # xdist workers share the file, so wait on each other's write locks
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB)"
+        )
+        self._db.commit()
+    
+    @staticmethod
+    def key_for(request: httpx.Request) -> str:
+        """Hash the harness version, request method, URL and (canonicalized JSON) body."""
+        body = request.content
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True).encode()
+        except ValueError:
+            pass
+        
+        digest = hashlib.sha256()
+        digest.update(livekit_agents_version.encode())
+        digest.update(request.method.encode())
+        digest.update(str(request.url).encode())
+        digest.update(body)
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[httpx.Response]:
+        """Return the recorded response for a key, if any."""
+        row = self._db.execute(
+            "SELECT status, headers, body FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        status, headers, body = row
+        return httpx.Response(status, headers=json.loads(headers), content=body)
+    
+    def put(self, key: str, response: httpx.Response, body: bytes) -> None:
+        """Record a response and its raw body under a key."""
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (key, response.status_code, json.dumps(response.headers.multi_items()), body),
+        )
+        self._db.commit()
+    
+    def close(self) -> None:
+        self._db.close()
+
+
+@pytest.fixture(scope="session")
+def llm_cache():
+    """Record and replay LLM API responses at the httpx transport layer.
+    
+    Requested through ``test_llm``, so the cache database is only opened in
+    sessions that actually run an LLM test.
+    """
+    if LLM_CACHE_MODE == "off":
+        yield None
+        return
+    
+    cache = LLMResponseCache(LLM_CACHE_PATH)
+    send = httpx.AsyncHTTPTransport.handle_async_request
+    
+    async def handle_async_request(transport, request):
+        # Only API calls are cached; anything else goes straight through
+        if request.method != "POST":
+            return await send(transport, request)
+        
+        key = cache.key_for(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if LLM_CACHE_MODE == "replay":
+            raise RuntimeError(
+                f"LLM_CACHE=replay but no recorded response for {request.url}; "
+                "run with LLM_CACHE=record to record it"
+            )
+        
+        response = await send(transport, request)
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        
+        # Never persist transient failures
+        if response.is_success:
+            cache.put(key, response, body)
+        
+        return httpx.Response(response.status_code, headers=response.headers, content=body)
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request)
+        yield cache
+    
+    cache.close()
+
+
+@dataclass
+class FakeRunContext:
+    """Stand-in for RunContext in direct tool calls.
+    
+    Tools under test only receive the context, so a plain dataclass avoids the
+    attribute introspection cost of ``Mock(spec=RunContext)``.
+    """
+    userdata: dict = field(default_factory=dict)
+
+
+# Fixtures for pytest
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def test_llm(llm_cache):
+    """Provide one pooled LLM client for the whole test session."""
+    async with openai.LLM(model="gpt-4o-mini") as llm:
+        yield llm
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def test_session(test_llm):
+    """Provide test session instance."""
+    async with AgentSession(llm=test_llm) as session:
+        yield session
+
+
+@pytest.fixture
+def ctx():
+    """Provide a fresh run context for calling tools directly."""
+    return FakeRunContext()
@@ -0,0 +1,118 @@
+"""
+Micro-benchmarks for hot paths, using pytest-benchmark.
+
+Benchmarks are skipped in a plain ``pytest`` run. Select them with
+``--benchmark-only``, save a baseline, then fail a later run that regresses
+the mean by over 5%:
+
+    pytest --benchmark-only --benchmark-autosave examples/testing_patterns/
+    pytest --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:5% examples/testing_patterns/
+"""
+
+import asyncio
+import itertools
+import json
+
+import aresponses
+import pytest
+
+from examples.token_server.client_example import TokenClient
+from examples.tool_enabled_agent.agent import ToolEnabledAgent
+from examples.tool_enabled_agent.tools import (
+    database_query,
+    get_tool_by_name,
+    list_available_tools,
+)
+
+
+TOKEN_SERVER_URL = "https://tokens.example.com"
+TOKEN_BODY = json.dumps({
+    "token": "eyJhbGciOiJIUzI1NiJ9.e30.signature",
+    "url": "wss://example.livekit.cloud",
+    "expires_at": "2030-01-01T00:00:00Z",
+})
+METADATA = {"user_id": "user-123", "role": "customer", "language": "en"}
+
+
+@pytest.fixture
+def run():
+    """Run coroutines on a private event loop.
+
+    pytest-benchmark only times synchronous callables, so async code paths
+    are driven through ``run_until_complete``.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def token_client(run):
+    """Provide a TokenClient whose requests are answered by a local mock server."""
+    server = aresponses.ResponsesMockServer()
+    run(server.__aenter__())
+    server.add(
+        "tokens.example.com",
+        "/token",
+        "POST",
+        server.Response(text=TOKEN_BODY, content_type="application/json"),
+        repeat=server.INFINITY,
+    )
+    client = TokenClient(TOKEN_SERVER_URL)
+    yield client
+    run(client.close())
+    run(server.__aexit__(None, None, None))
+
+
+@pytest.mark.benchmark(group="token")
+def test_get_token(benchmark, run, token_client):
+    """Benchmark a TokenClient.get_token round trip over a pooled connection."""
+    def get_token():
+        return run(token_client.get_token("support-room", "Jane Smith", METADATA))
+
+    assert benchmark(get_token)["url"] == "wss://example.livekit.cloud"
+
+
+@pytest.mark.benchmark(group="calculate")
+def test_calculate_uncached(benchmark, run, ctx):
+    """Benchmark the calculate tool on expressions it hasn't seen before."""
+    agent = ToolEnabledAgent()
+    operands = itertools.count()
+
+    def fresh_expression():
+        return (f"max(5, {next(operands)}, 3) + 2 * 3",), {}
+
+    def calculate(expression):
+        return run(agent.calculate(ctx, expression))
+
+    result = benchmark.pedantic(calculate, setup=fresh_expression, rounds=2000)
+    assert result.startswith("The result of")
+
+
+@pytest.mark.benchmark(group="calculate")
+def test_calculate_cached(benchmark, run, ctx):
+    """Benchmark the calculate tool on a repeated expression."""
+    agent = ToolEnabledAgent()
+
+    def calculate():
+        return run(agent.calculate(ctx, "max(5, 10, 3) + 2 * 3"))
+
+    assert "16" in benchmark(calculate)
+
+
+@pytest.mark.benchmark(group="tools")
+def test_database_query(benchmark, run, ctx):
+    """Benchmark an indexed database_query lookup."""
+    def query():
+        return run(database_query(ctx, table="customers", filters={"status": "active"}))
+
+    assert "Found" in benchmark(query)
+
+
+@pytest.mark.benchmark(group="tools")
+def test_tool_lookup(benchmark):
+    """Benchmark listing the tool registry and resolving a tool by name."""
+    def lookup():
+        return "database_query" in list_available_tools() and get_tool_by_name("translate_text")
+
+    assert benchmark(lookup)
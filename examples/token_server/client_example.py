@@ -7,19 +7,55 @@ and use them to connect to LiveKit rooms.
 """
 
 import asyncio
-import json
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import aiohttp
+import orjson
 from livekit import rtc
 
 
+def _dumps(obj) -> str:
+    """Serialize to a JSON string with orjson."""
+    return orjson.dumps(obj).decode()
+
+
 class TokenClient:
-    """Client for requesting tokens from the token server."""
+    """Client for requesting tokens from the token server.
+    
+    Reuses one HTTP session (and its keep-alive connections) across requests.
+    Use it as ``async with TokenClient() as client:`` or call ``close()``.
+    Pass ``session`` to share an existing pool, e.g. a test fixture's; an
+    injected session is left open for its owner to close.
+    """
     
-    def __init__(self, server_url: str = "http://localhost:8080"):
+    def __init__(
+        self,
+        server_url: str = "http://localhost:8080",
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
         self.server_url = server_url.rstrip("/")
+        self._session = session
+        self._owns_session = session is None
+    
+    async def __aenter__(self) -> "TokenClient":
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = aiohttp.ClientSession(json_serialize=_dumps)
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the HTTP session if this client created it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
     
     async def get_token(
         self,
@@ -38,98 +74,133 @@ class TokenClient:
         Returns:
             Token response with token, url, and expiry
         """
-        async with aiohttp.ClientSession() as session:
-            payload = {
-                "room_name": room_name,
-                "participant_name": participant_name,
-            }
-            
-            if metadata:
-                payload["metadata"] = json.dumps(metadata)
+        payload = {
+            "room_name": room_name,
+            "participant_name": participant_name,
+        }
+        
+        # The server takes metadata as a JSON string inside the JSON body
+        if metadata:
+            payload["metadata"] = _dumps(metadata)
+        
+        async with self._get_session().post(
+            f"{self.server_url}/token",
+            json=payload
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    async def get_tokens(
+        self,
+        token_requests: List[Tuple[str, str, Optional[dict]]],
+        max_concurrency: int = 10,
+    ) -> List[dict]:
+        """
+        Request several tokens concurrently.
+        
+        Args:
+            token_requests: (room_name, participant_name, metadata) tuples
+            max_concurrency: Maximum number of requests in flight at once
             
-            async with session.post(
-                f"{self.server_url}/token",
-                json=payload
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
+        Returns:
+            Token responses, in the same order as the requests
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def get_one(room_name: str, participant_name: str, metadata: Optional[dict]) -> dict:
+            async with semaphore:
+                return await self.get_token(room_name, participant_name, metadata)
+        
+        return await asyncio.gather(
+            *(get_one(*token_request) for token_request in token_requests)
+        )
     
     async def check_health(self) -> bool:
         """Check if the token server is healthy."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.server_url}/health") as response:
-                    return response.status == 200
+            async with self._get_session().get(f"{self.server_url}/health") as response:
+                return response.status == 200
         except Exception:
             return False
 
 
 async def example_usage():
     """Demonstrate token client usage."""
-    # Create client
-    client = TokenClient()
-    
-    # Check server health
-    print("Checking server health...")
-    is_healthy = await client.check_health()
-    if not is_healthy:
-        print("❌ Token server is not healthy!")
-        return
-    print("✅ Token server is healthy")
-    
-    # Request a token
-    print("\nRequesting token...")
-    try:
-        token_response = await client.get_token(
-            room_name="test-room-123",
-            participant_name="test-user",
-            metadata={"role": "participant", "source": "example"}
-        )
+    # Create client; both requests below share one connection
+    async with TokenClient() as client:
+        # Check server health
+        print("Checking server health...")
+        is_healthy = await client.check_health()
+        if not is_healthy:
+            print("❌ Token server is not healthy!")
+            return
+        print("✅ Token server is healthy")
         
-        print(f"✅ Got token!")
-        print(f"   Token: {token_response['token'][:50]}...")
-        print(f"   URL: {token_response['url']}")
-        print(f"   Expires: {token_response['expires_at']}")
-        
-        # Example: Connect to room with the token
-        # room = rtc.Room()
-        # await room.connect(
-        #     token_response['url'],
-        #     token_response['token']
-        # )
-        
-    except aiohttp.ClientError as e:
-        print(f"❌ Failed to get token: {e}")
+        # Request a token
+        print("\nRequesting token...")
+        try:
+            token_response = await client.get_token(
+                room_name="test-room-123",
+                participant_name="test-user",
+                metadata={"role": "participant", "source": "example"}
+            )
+            
+            print(f"✅ Got token!")
+            print(f"   Token: {token_response['token'][:50]}...")
+            print(f"   URL: {token_response['url']}")
+            print(f"   Expires: {token_response['expires_at']}")
+            
+            # Request tokens for several participants at once
+            batch = await client.get_tokens([
+                ("test-room-123", f"test-user-{i}", None) for i in range(3)
+            ])
+            print(f"✅ Got {len(batch)} tokens in one batch")
+            
+            # Example: Connect to room with the token
+            # room = rtc.Room()
+            # await room.connect(
+            #     token_response['url'],
+            #     token_response['token']
+            # )
+            
+        except aiohttp.ClientError as e:
+            print(f"❌ Failed to get token: {e}")
 
 
 def example_sync_usage():
     """Example using requests library (synchronous)."""
     import requests
+    from requests.adapters import HTTPAdapter
     
-    # Check health
-    try:
-        response = requests.get("http://localhost:8080/health")
-        response.raise_for_status()
-        print("✅ Server is healthy")
-    except requests.RequestException as e:
-        print(f"❌ Health check failed: {e}")
-        return
-    
-    # Get token
-    try:
-        response = requests.post(
-            "http://localhost:8080/token",
-            json={
-                "room_name": "sync-test-room",
-                "participant_name": "sync-user",
-            }
-        )
-        response.raise_for_status()
-        token_data = response.json()
-        print(f"✅ Got token: {token_data['token'][:50]}...")
+    # One session keeps the connection alive between the two requests
+    with requests.Session() as http:
+        http.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
         
-    except requests.RequestException as e:
-        print(f"❌ Failed to get token: {e}")
+        # Check health
+        try:
+            response = http.get("http://localhost:8080/health")
+            response.raise_for_status()
+            print("✅ Server is healthy")
+        except requests.RequestException as e:
+            print(f"❌ Health check failed: {e}")
+            return
+        
+        # Get token
+        try:
+            response = http.post(
+                "http://localhost:8080/token",
+                json={
+                    "room_name": "sync-test-room",
+                    "participant_name": "sync-user",
+                }
+            )
+            response.raise_for_status()
+            token_data = response.json()
+            print(f"✅ Got token: {token_data['token'][:50]}...")
+            
+        except requests.RequestException as e:
+            print(f"❌ Failed to get token: {e}")
 
 
 if __name__ == "__main__":
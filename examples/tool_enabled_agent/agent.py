@@ -1,13 +1,17 @@
+import ast
+import functools
 import logging
-import aiohttp
+import operator
 import json
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     WorkerOptions,
     cli,
     function_tool,
@@ -21,6 +25,65 @@ logger = logging.getLogger("tool-agent")
 
 load_dotenv()
 
+# Functions the calculate tool may call
+_CALC_FUNCTIONS = {
+    "abs": abs, "round": round, "min": min, "max": max,
+    "sum": sum, "pow": pow, "len": len,
+}
+
+_CALC_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow, ast.USub: operator.neg,
+}
+
+_CALC_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+    ast.Call, ast.Tuple, ast.List, *_CALC_OPERATORS,
+)
+
+
+# ZoneInfo only keeps a few zones strongly cached; keep every zone users ask for
+_zone_info = functools.lru_cache(maxsize=128)(ZoneInfo)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_expression(expression: str) -> ast.expr:
+    """Parse and validate an arithmetic expression.
+    
+    Only numeric literals, arithmetic operators and calls to the whitelisted
+    functions are allowed. Results are cached, so repeated expressions skip
+    parsing and validation.
+    """
+    tree = ast.parse(expression, mode="eval")
+    
+    for node in ast.walk(tree):
+        if not isinstance(node, _CALC_NODES):
+            raise ValueError(f"unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError("only numeric literals are allowed")
+        if isinstance(node, ast.Name) and node.id not in _CALC_FUNCTIONS:
+            raise ValueError(f"unknown name: {node.id}")
+        if isinstance(node, ast.Call) and (node.keywords or not isinstance(node.func, ast.Name)):
+            raise ValueError("only plain calls to math functions are allowed")
+    
+    return tree.body
+
+
+def _evaluate(node: ast.expr):
+    """Evaluate a validated expression tree."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.BinOp):
+        return _CALC_OPERATORS[type(node.op)](_evaluate(node.left), _evaluate(node.right))
+    if isinstance(node, ast.UnaryOp):
+        return _CALC_OPERATORS[type(node.op)](_evaluate(node.operand))
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return [_evaluate(element) for element in node.elts]
+    if isinstance(node, ast.Call):
+        return _CALC_FUNCTIONS[node.func.id](*(_evaluate(arg) for arg in node.args))
+    raise ValueError(f"{ast.unparse(node)} is not a value")
+
 
 class ToolEnabledAgent(Agent):
     """Agent with multiple external tool integrations."""
@@ -90,18 +153,7 @@ class ToolEnabledAgent(Agent):
         logger.info(f"Calculating: {expression}")
         
         try:
-            # Safe evaluation of mathematical expressions
-            # In production, use a proper math parser
-            allowed_names = {
-                "abs": abs, "round": round, "min": min, "max": max,
-                "sum": sum, "pow": pow, "len": len,
-            }
-            
-            # Remove dangerous characters
-            if any(char in expression for char in ["import", "exec", "eval", "__"]):
-                raise ToolError("Invalid expression")
-            
-            result = eval(expression, {"__builtins__": {}}, allowed_names)
+            result = _evaluate(_parse_expression(expression))
             return f"The result of {expression} is {result}"
             
         except Exception as e:
@@ -125,27 +177,26 @@ class ToolEnabledAgent(Agent):
         
         try:
             # In production, use actual weather API
-            async with aiohttp.ClientSession() as session:
-                # Mock response - replace with actual API call
-                weather_data = {
-                    "location": location,
-                    "temperature": 72 if units == "fahrenheit" else 22,
-                    "conditions": "partly cloudy",
-                    "humidity": 65,
-                    "wind_speed": 10,
-                    "wind_direction": "NW",
-                }
-                
-                unit_symbol = "°F" if units == "fahrenheit" else "°C"
-                
-                return (
-                    f"Weather in {weather_data['location']}:\n"
-                    f"Temperature: {weather_data['temperature']}{unit_symbol}\n"
-                    f"Conditions: {weather_data['conditions']}\n"
-                    f"Humidity: {weather_data['humidity']}%\n"
-                    f"Wind: {weather_data['wind_speed']} mph {weather_data['wind_direction']}"
-                )
-                
+            # Mock response - replace with actual API call
+            weather_data = {
+                "location": location,
+                "temperature": 72 if units == "fahrenheit" else 22,
+                "conditions": "partly cloudy",
+                "humidity": 65,
+                "wind_speed": 10,
+                "wind_direction": "NW",
+            }
+            
+            unit_symbol = "°F" if units == "fahrenheit" else "°C"
+            
+            return (
+                f"Weather in {weather_data['location']}:\n"
+                f"Temperature: {weather_data['temperature']}{unit_symbol}\n"
+                f"Conditions: {weather_data['conditions']}\n"
+                f"Humidity: {weather_data['humidity']}%\n"
+                f"Wind: {weather_data['wind_speed']} mph {weather_data['wind_direction']}"
+            )
+            
         except Exception as e:
             logger.error(f"Weather API error: {e}")
             raise ToolError("Unable to fetch weather data")
@@ -162,9 +213,7 @@ class ToolEnabledAgent(Agent):
             timezone: Timezone name (e.g., "America/New_York", "Europe/London")
         """
         try:
-            from zoneinfo import ZoneInfo
-            
-            tz = ZoneInfo(timezone)
+            tz = _zone_info(timezone)
             current_time = datetime.now(tz)
             
             return f"Current time in {timezone}: {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}"
@@ -238,12 +287,18 @@ class ToolEnabledAgent(Agent):
             raise ToolError("Unable to retrieve location. Please ensure location access is enabled.")
 
 
+def prewarm(proc: JobProcess):
+    """Preload the VAD model and STT client before job assignment."""
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(model="nova-3")
+
+
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
     
     session = AgentSession(
-        vad=silero.VAD.load(),
-        stt=deepgram.STT(model="nova-3"),
+        vad=ctx.proc.userdata["vad"],
+        stt=ctx.proc.userdata["stt"],
         llm=openai.LLM(
             model="gpt-4o-mini",
             temperature=0.7,  # Slightly lower for tool usage
@@ -268,5 +323,6 @@ async def entrypoint(ctx: JobContext):
 
 if __name__ == "__main__":
     cli.run_app(WorkerOptions(
-        entrypoint_fnc=entrypoint
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm
     ))
\ No newline at end of file
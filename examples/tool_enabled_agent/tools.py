@@ -4,8 +4,12 @@ Additional tool implementations that can be imported and used by agents.
 This module demonstrates how to organize tools separately from the main agent code.
 """
 
+import functools
+import itertools
 import logging
 import json
+import types
+from collections import defaultdict
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 
@@ -13,6 +17,44 @@ from livekit.agents import function_tool, RunContext, ToolError
 
 logger = logging.getLogger("agent-tools")
 
+# Mock tables - replace with actual database connection
+_MOCK_TABLES = {
+    "customers": (
+        {"id": 1, "name": "John Doe", "email": "john@example.com", "status": "active"},
+        {"id": 2, "name": "Jane Smith", "email": "jane@example.com", "status": "active"},
+    ),
+    "orders": (
+        {"id": 101, "customer_id": 1, "total": 99.99, "status": "shipped"},
+        {"id": 102, "customer_id": 2, "total": 149.99, "status": "pending"},
+    ),
+}
+
+
+def _build_indexes(rows, columns) -> Dict[str, Dict[Any, List[dict]]]:
+    """Index rows by value for each of the given columns."""
+    indexes = {column: defaultdict(list) for column in columns}
+    for row in rows:
+        for column, index in indexes.items():
+            index[row.get(column)].append(row)
+    return indexes
+
+
+# Indexes on the columns queries usually filter by: table -> column -> value -> rows
+_MOCK_INDEXES = {
+    "customers": _build_indexes(_MOCK_TABLES["customers"], ("id", "status")),
+    "orders": _build_indexes(_MOCK_TABLES["orders"], ("id", "customer_id", "status")),
+}
+
+# Sequential mock appointment IDs; unlike a timestamp they can't collide
+# when two appointments are booked in the same second
+_appointment_ids = itertools.count(1)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_datetime(value: str, fmt: str) -> datetime:
+    """Parse a date string, caching results since the same dates recur in a session."""
+    return datetime.strptime(value, fmt)
+
 
 @function_tool
 async def database_query(
@@ -33,23 +75,24 @@ async def database_query(
     # Mock database query - replace with actual database connection
     try:
         # In production, use proper database connection with parameterized queries
-        if table == "customers":
-            mock_data = [
-                {"id": 1, "name": "John Doe", "email": "john@example.com", "status": "active"},
-                {"id": 2, "name": "Jane Smith", "email": "jane@example.com", "status": "active"},
-            ]
-        elif table == "orders":
-            mock_data = [
-                {"id": 101, "customer_id": 1, "total": 99.99, "status": "shipped"},
-                {"id": 102, "customer_id": 2, "total": 149.99, "status": "pending"},
-            ]
-        else:
+        if table not in _MOCK_TABLES:
             raise ToolError(f"Table '{table}' not found")
         
-        # Apply filters
-        filtered_data = mock_data
+        # Narrow the rows with an index lookup when one covers a filter
+        indexes = _MOCK_INDEXES[table]
+        indexed_key = next((key for key in filters if key in indexes), None)
+        filtered_data = _MOCK_TABLES[table]
+        if indexed_key is not None:
+            try:
+                filtered_data = indexes[indexed_key].get(filters[indexed_key], [])
+            except TypeError:
+                # Unhashable filter value; fall back to scanning
+                indexed_key = None
+        
+        # Apply the remaining filters
         for key, value in filters.items():
-            filtered_data = [row for row in filtered_data if row.get(key) == value]
+            if key != indexed_key:
+                filtered_data = [row for row in filtered_data if row.get(key) == value]
         
         # Apply limit
         filtered_data = filtered_data[:limit]
@@ -87,16 +130,17 @@ async def schedule_appointment(
     """
     try:
         # Parse date and time
-        appointment_datetime = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+        appointment_datetime = _parse_datetime(f"{date} {time}", "%Y-%m-%d %H:%M")
         end_time = appointment_datetime + timedelta(minutes=duration_minutes)
+        now = datetime.now()
         
         # Check if in future
-        if appointment_datetime < datetime.now():
+        if appointment_datetime < now:
             raise ToolError("Cannot schedule appointments in the past")
         
         # Mock appointment creation
         appointment = {
-            "id": "APT-" + datetime.now().strftime("%Y%m%d%H%M%S"),
+            "id": f"APT-{next(_appointment_ids):06d}",
             "start": appointment_datetime.isoformat(),
             "end": end_time.isoformat(),
             "duration": duration_minutes,
@@ -122,6 +166,26 @@ async def schedule_appointment(
         raise ToolError(f"Failed to schedule appointment: {str(e)}")
 
 
+# Supported target languages, by language code
+_LANGUAGE_NAMES = types.MappingProxyType({
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "zh": "Chinese",
+})
+
+# Mock translations
+_MOCK_TRANSLATIONS = types.MappingProxyType({
+    "es": "Hola, ¿cómo estás?",
+    "fr": "Bonjour, comment allez-vous?",
+    "de": "Hallo, wie geht es dir?",
+})
+
+
 @function_tool
 async def translate_text(
     context: RunContext,
@@ -139,34 +203,16 @@ async def translate_text(
     logger.info(f"Translating to {target_language}: {text[:50]}...")
     
     # Mock translation - in production use translation API
-    language_names = {
-        "es": "Spanish",
-        "fr": "French",
-        "de": "German",
-        "it": "Italian",
-        "pt": "Portuguese",
-        "ja": "Japanese",
-        "ko": "Korean",
-        "zh": "Chinese",
-    }
-    
-    if target_language not in language_names:
+    language_name = _LANGUAGE_NAMES.get(target_language)
+    if language_name is None:
         raise ToolError(f"Unsupported language: {target_language}")
     
-    # Mock translations
-    mock_translations = {
-        "es": "Hola, ¿cómo estás?",
-        "fr": "Bonjour, comment allez-vous?",
-        "de": "Hallo, wie geht es dir?",
-    }
-    
-    translation = mock_translations.get(
-        target_language,
-        f"[Translation to {language_names[target_language]}]: {text}"
-    )
+    translation = _MOCK_TRANSLATIONS.get(target_language)
+    if translation is None:
+        translation = f"[Translation to {language_name}]: {text}"
     
     return (
-        f"Translation to {language_names[target_language]}:\n"
+        f"Translation to {language_name}:\n"
         f"Original: {text}\n"
         f"Translated: {translation}"
     )
@@ -192,8 +238,8 @@ async def generate_report(
     
     try:
         # Validate dates
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+        start = _parse_datetime(start_date, "%Y-%m-%d")
+        end = _parse_datetime(end_date, "%Y-%m-%d")
         
         if start > end:
             raise ToolError("Start date must be before end date")
@@ -234,13 +280,15 @@ async def generate_report(
         raise ToolError(f"Failed to generate report: {str(e)}")
 
 
-# Tool registry for dynamic loading
-AVAILABLE_TOOLS = {
+# Tool registry for dynamic loading (read-only, so lookups can be precomputed)
+AVAILABLE_TOOLS = types.MappingProxyType({
     "database_query": database_query,
     "schedule_appointment": schedule_appointment,
     "translate_text": translate_text,
     "generate_report": generate_report,
-}
+})
+
+_TOOL_NAMES = tuple(AVAILABLE_TOOLS)
 
 
 def get_tool_by_name(name: str):
@@ -250,4 +298,4 @@ def get_tool_by_name(name: str):
 
 def list_available_tools() -> List[str]:
     """List all available tool names."""
-    return list(AVAILABLE_TOOLS.keys())
\ No newline at end of file
+    return list(_TOOL_NAMES)
\ No newline at end of file
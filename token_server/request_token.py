@@ -16,6 +16,7 @@ import requests
 import json
 import sys
 from datetime import datetime
+from typing import Optional
 
 
 def request_token(
@@ -23,9 +24,15 @@ def request_token(
     email: str,
     full_name: str,
     user_id: str = None,
-    room_name: str = None
+    room_name: str = None,
+    session: Optional[requests.Session] = None
 ):
-    """Request a token from the token server."""
+    """Request a token from the token server.
+    
+    Pass ``session`` when requesting several tokens so they share one
+    keep-alive connection instead of opening a new one per request.
+    """
+    http = session or requests
     
     # Generate user_id from email if not provided
     if not user_id:
@@ -52,10 +59,9 @@ def request_token(
     
     try:
         # Make request
-        response = requests.post(
+        response = http.post(
             f"{server_url}/token",
-            json=data,
-            headers={"Content-Type": "application/json"}
+            json=data
         )
         
         if response.status_code == 200:
@@ -132,13 +138,15 @@ def main():
     args = parser.parse_args()
     
     # Request token
-    token, room = request_token(
-        server_url=args.server,
-        email=args.email,
-        full_name=args.name,
-        user_id=args.user_id,
-        room_name=args.room
-    )
+    with requests.Session() as session:
+        token, room = request_token(
+            server_url=args.server,
+            email=args.email,
+            full_name=args.name,
+            user_id=args.user_id,
+            room_name=args.room,
+            session=session
+        )
     
     # Exit with appropriate code
     sys.exit(0 if token else 1)
@@ -6,13 +6,25 @@ This script tests the token generation and validation endpoints.
 
 import requests
 import json
+import os
 import sys
+from requests.adapters import HTTPAdapter
+
+
+# Shared session so every probe reuses the same keep-alive connection
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Must match the server's TOKEN_MAX_BATCH_SIZE
+MAX_BATCH_SIZE = int(os.getenv("TOKEN_MAX_BATCH_SIZE", "100"))
 
 
 def test_health_check(base_url):
     """Test the health check endpoint."""
     print("Testing health check...")
-    response = requests.get(f"{base_url}/")
+    response = SESSION.get(f"{base_url}/")
     
     if response.status_code == 200:
         print("✅ Health check passed")
@@ -35,7 +47,7 @@ def test_token_generation(base_url):
         "room_name": "test-appointment-room"
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{base_url}/token",
         json=test_user,
         headers={"Content-Type": "application/json"}
@@ -54,6 +66,101 @@ def test_token_generation(base_url):
     return None
 
 
+def test_jwt_encoding():
+    """Test that locally signed tokens are valid HS256 JWTs."""
+    print("\nTesting JWT encoding...")
+    
+    # Runs in-process against the signer, so it needs the server's env vars
+    import jwt
+    import token_server
+    
+    claims = {
+        "iss": token_server.LIVEKIT_API_KEY,
+        "sub": "test-user-123",
+        "iat": 1700000000,
+        "nbf": 1700000000,
+        "exp": 4102444800,
+        "name": "Test User",
+        "video": {"room": "test-appointment-room", "roomJoin": True},
+    }
+    token = token_server.encode_jwt(claims)
+    
+    header = jwt.get_unverified_header(token)
+    decoded = jwt.decode(token, token_server.LIVEKIT_API_SECRET, algorithms=["HS256"])
+    
+    passed = header == {"alg": "HS256", "typ": "JWT"} and decoded == claims
+    if passed:
+        print("✅ JWT encoding passed")
+        print(f"   Header: {header}")
+    else:
+        print("❌ JWT does not round-trip through PyJWT")
+        print(f"   Header: {header}")
+        print(f"   Claims: {decoded}")
+    return passed
+
+
+def test_batch_token_generation(base_url):
+    """Test batch token generation endpoint."""
+    print("\nTesting batch token generation...")
+    
+    test_users = [
+        {
+            "user_email": f"batch{i}@example.com",
+            "full_name": f"Batch User {i}",
+            "user_id": f"batch-user-{i}",
+            "room_name": f"batch-room-{i}"
+        }
+        for i in range(3)
+    ]
+    
+    passed = True
+    
+    # Tokens come back in request order, with the completed count in a header
+    response = SESSION.post(f"{base_url}/token/batch", json=test_users)
+    if response.status_code == 200:
+        rooms = [token["room_name"] for token in response.json()["tokens"]]
+        completed = response.headers.get("X-Batch-Completed")
+        if rooms == [user["room_name"] for user in test_users] and completed == "3":
+            print("✅ Batch returned tokens in request order")
+            print(f"   Rooms: {rooms}")
+            print(f"   X-Batch-Completed: {completed}")
+        else:
+            print("❌ Batch response out of order or wrong count")
+            print(f"   Rooms: {rooms}")
+            print(f"   X-Batch-Completed: {completed}")
+            passed = False
+    else:
+        print(f"❌ Batch token generation failed: {response.status_code}")
+        print(f"   Response: {response.text}")
+        passed = False
+    
+    # An empty batch succeeds with no tokens
+    response = SESSION.post(f"{base_url}/token/batch", json=[])
+    if (
+        response.status_code == 200
+        and response.json()["tokens"] == []
+        and response.headers.get("X-Batch-Completed") == "0"
+    ):
+        print("✅ Empty batch returned no tokens")
+    else:
+        print(f"❌ Empty batch failed: {response.status_code}")
+        print(f"   Response: {response.text}")
+        passed = False
+    
+    # Batches over the limit are rejected by request validation
+    response = SESSION.post(
+        f"{base_url}/token/batch",
+        json=[test_users[0]] * (MAX_BATCH_SIZE + 1)
+    )
+    if response.status_code == 422:
+        print(f"✅ Batch of {MAX_BATCH_SIZE + 1} rejected with 422")
+    else:
+        print(f"❌ Oversized batch not rejected: {response.status_code}")
+        passed = False
+    
+    return passed
+
+
 def test_token_validation(base_url, token):
     """Test token validation endpoint."""
     print("\nTesting token validation...")
@@ -62,7 +169,7 @@ def test_token_validation(base_url, token):
         print("⚠️  No token to validate, skipping...")
         return False
     
-    response = requests.post(
+    response = SESSION.post(
         f"{base_url}/validate",
         params={"token": token}
     )
@@ -85,11 +192,47 @@ def test_token_validation(base_url, token):
     return False
 
 
+def test_malformed_token_rejection(base_url):
+    """Test that /validate rejects tokens that can't be JWTs before decoding them."""
+    print("\nTesting malformed token rejection...")
+    
+    # Runs partly in-process to prove jwt.decode is never reached
+    import asyncio
+    from unittest.mock import patch
+    import token_server
+    
+    malformed_tokens = {
+        "one dot": "a" * 30 + "." + "b" * 30,
+        "three dots": "a" * 30 + "." + "b" * 30 + "." + "c" * 30 + "." + "d",
+        "too short": "a.b.c",
+        "too long": "a" * 8190 + ".b.c",
+    }
+    
+    passed = True
+    for label, token in malformed_tokens.items():
+        response = SESSION.post(f"{base_url}/validate", params={"token": token})
+        data = response.json() if response.status_code == 200 else {}
+        
+        with patch.object(token_server.jwt, "decode") as decode:
+            local = asyncio.run(token_server.validate_token(token))
+        
+        if data.get("valid") is False and data.get("error") and local == data and not decode.called:
+            print(f"✅ Rejected {label} token")
+            print(f"   Error: {data['error']}")
+        else:
+            print(f"❌ {label} token not rejected up front: {response.status_code}")
+            print(f"   Response: {response.text[:200]}")
+            print(f"   jwt.decode called: {decode.called}")
+            passed = False
+    
+    return passed
+
+
 def test_cors_headers(base_url):
     """Test CORS headers."""
     print("\nTesting CORS headers...")
     
-    response = requests.options(
+    response = SESSION.options(
         f"{base_url}/token",
         headers={
             "Origin": "http://localhost:3000",
@@ -125,21 +268,27 @@ def main():
     print("=" * 50)
     
     # Run tests
+    encoding_ok = test_jwt_encoding()
     health_ok = test_health_check(base_url)
     token = test_token_generation(base_url) if health_ok else None
+    batch_ok = test_batch_token_generation(base_url) if health_ok else False
     validation_ok = test_token_validation(base_url, token) if token else False
+    malformed_ok = test_malformed_token_rejection(base_url) if health_ok else False
     cors_ok = test_cors_headers(base_url) if health_ok else False
     
     # Summary
     print("\n" + "=" * 50)
     print("Test Summary:")
+    print(f"  JWT Encoding: {'✅ PASS' if encoding_ok else '❌ FAIL'}")
     print(f"  Health Check: {'✅ PASS' if health_ok else '❌ FAIL'}")
     print(f"  Token Generation: {'✅ PASS' if token else '❌ FAIL'}")
+    print(f"  Batch Generation: {'✅ PASS' if batch_ok else '❌ FAIL'}")
     print(f"  Token Validation: {'✅ PASS' if validation_ok else '❌ FAIL'}")
+    print(f"  Malformed Tokens: {'✅ PASS' if malformed_ok else '❌ FAIL'}")
     print(f"  CORS Headers: {'✅ PASS' if cors_ok else '❌ FAIL'}")
     
     # Exit code
-    all_passed = health_ok and token and validation_ok and cors_ok
+    all_passed = encoding_ok and health_ok and token and batch_ok and validation_ok and malformed_ok and cors_ok
     sys.exit(0 if all_passed else 1)
 
 
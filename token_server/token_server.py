@@ -7,23 +7,41 @@ secure token generation with proper claims and permissions.
 """
 
 import os
+import asyncio
+import atexit
+import base64
+import hashlib
+import hmac
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+import logging.handlers
+import queue
+import time
+from datetime import datetime
+from typing import Annotated, List, Optional
 from contextlib import asynccontextmanager
+from importlib.util import find_spec
 
-from fastapi import FastAPI, HTTPException, Request
+import jwt
+import orjson
+from cachetools import TLRUCache
+from fastapi import Body, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from jose import jwt, JWTError
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging. Handlers only enqueue records; a listener thread writes
+# them out, so slow log I/O never blocks the event loop.
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
 logger = logging.getLogger("token-server")
 
 # LiveKit configuration from environment
@@ -35,19 +53,78 @@ if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET:
 
 # Server configuration
 PORT = int(os.getenv("TOKEN_SERVER_PORT", "8001"))
-CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
+# A set, so the per-request origin check is a hash lookup rather than a list scan
+CORS_ORIGINS = frozenset(
+    origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()
+)
 TOKEN_EXPIRY_HOURS = int(os.getenv("TOKEN_EXPIRY_HOURS", "24"))
+MAX_BATCH_SIZE = int(os.getenv("TOKEN_MAX_BATCH_SIZE", "100"))
+# Token signing is CPU-bound, so scale out with one worker process per core
+WORKERS = int(
+    os.getenv("TOKEN_SERVER_WORKERS")
+    or os.getenv("WEB_CONCURRENCY")
+    or os.cpu_count()
+    or 1
+)
+
+# Length bounds for a plausible JWT; /validate rejects anything outside them
+MIN_TOKEN_LENGTH = 20
+MAX_TOKEN_LENGTH = 8192
+
+# /validate results for tokens that passed verification, keyed by a digest of
+# the token. Each entry expires with its token's own exp claim (an epoch time,
+# hence timer=time.time), so an expired token is never served from the cache.
+validated_tokens = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda key, entry, now: entry[0],
+    timer=time.time,
+)
+
+
+# Fields of the / health check that only change with a new deployment
+HEALTH_STATUS = {
+    "status": "healthy",
+    "service": "LiveKit Token Server",
+    "version": "1.0.0",
+}
+# Weak ETag over the status fields only. The timestamp changes every second,
+# so hashing the whole body would never let a conditional probe match.
+HEALTH_ETAG = f'W/"{hashlib.blake2b(orjson.dumps(HEALTH_STATUS), digest_size=8).hexdigest()}"'
+
+def render_health() -> bytes:
+    """Serialize the health check body with the current timestamp."""
+    return orjson.dumps({**HEALTH_STATUS, "timestamp": datetime.utcnow().isoformat()})
+
+
+# Pre-serialized body for the / health check. Probes hit it constantly, so it
+# is re-rendered once a second by a background task instead of per request.
+# It is rendered here too, so requests served before startup (or without the
+# lifespan, as under TestClient) still get a valid body.
+health_body = render_health()
+
+
+async def refresh_health():
+    """Re-render the health check body every second."""
+    global health_body
+    while True:
+        await asyncio.sleep(1)
+        health_body = render_health()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events."""
+    global health_body
+    
     # Startup
-    logger.info(f"Token server starting on port {PORT}")
-    logger.info(f"CORS origins: {CORS_ORIGINS}")
-    logger.info(f"Token expiry: {TOKEN_EXPIRY_HOURS} hours")
+    logger.info("Token server starting on port %s", PORT)
+    logger.info("CORS origins: %s", ", ".join(sorted(CORS_ORIGINS)))
+    logger.info("Token expiry: %s hours", TOKEN_EXPIRY_HOURS)
+    health_body = render_health()
+    health_task = asyncio.create_task(refresh_health())
     yield
     # Shutdown
+    health_task.cancel()
     logger.info("Token server shutting down")
 
 
@@ -56,10 +133,12 @@ app = FastAPI(
     title="LiveKit Token Server",
     description="Generate JWT tokens for LiveKit room access",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Configure CORS
+# Configure CORS. Starlette only ever tests "origin in allow_origins", and a
+# "*" entry already short-circuits that check, so the set can be passed as is.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -68,6 +147,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress token responses but not tiny bodies like /validate errors or the
+# health check. Level 1 is much faster than the default and barely larger on
+# base64-heavy JWT payloads.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=1)
+
 
 # Request/Response models
 class TokenRequest(BaseModel):
@@ -92,21 +176,89 @@ class TokenResponse(BaseModel):
     """Response model for token generation."""
     token: str = Field(..., description="JWT token for LiveKit")
     room_name: str = Field(..., description="Room name to join")
+
+
+class TokenBatchResponse(BaseModel):
+    """Response model for batch token generation."""
+    tokens: List[TokenResponse] = Field(..., description="Tokens, in request order")
     
 
+# (second, formatted timestamp) for the most recent second seen
+_room_timestamp = (0, "")
+
+
+def room_timestamp() -> str:
+    """Return the current local time as YYYYMMDDHHMMSS, formatting it once per second."""
+    global _room_timestamp
+    now = int(time.time())
+    if now != _room_timestamp[0]:
+        _room_timestamp = (now, time.strftime("%Y%m%d%H%M%S", time.localtime(now)))
+    return _room_timestamp[1]
+
+
 def generate_room_name(user_email: str) -> str:
     """Generate a unique room name based on user email and timestamp."""
     # Simple room name generation - you might want something more sophisticated
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     email_prefix = user_email.split("@")[0]
-    return f"{email_prefix}-{timestamp}"
+    return f"{email_prefix}-{room_timestamp()}"
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as JWT segments require."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# Every token has the same header, and the signing key never changes, so both
+# are encoded once. The header segment includes its trailing "." separator.
+JWT_HEADER_SEGMENT = _b64url(orjson.dumps({"alg": "HS256", "typ": "JWT"})) + b"."
+SECRET_BYTES = LIVEKIT_API_SECRET.encode()
+# HMAC keyed once with the secret; copying it skips the key padding per token
+HMAC_TEMPLATE = hmac.new(SECRET_BYTES, None, hashlib.sha256)
+
+
+def encode_jwt(claims: dict) -> str:
+    """
+    Sign claims as an HS256 JWT.
+    
+    Equivalent to ``jwt.encode(claims, secret, algorithm="HS256")``, but the
+    header and claims are serialized straight to bytes with orjson instead of
+    going through the stdlib json module and a str round trip.
+    """
+    signing_input = JWT_HEADER_SEGMENT + _b64url(orjson.dumps(claims))
+    mac = HMAC_TEMPLATE.copy()
+    mac.update(signing_input)
+    signature = mac.digest()
+    return (signing_input + b"." + _b64url(signature)).decode()
+
+
+# Claims shared by every token. create_token copies this and fills in the
+# per-request fields; key order matches the serialized payload.
+CLAIMS_TEMPLATE = {
+    "iss": LIVEKIT_API_KEY,  # Issuer is the API key
+    "sub": "",  # Subject is the user identity
+    "iat": 0,  # Issued at
+    "nbf": 0,  # Not before
+    "exp": 0,  # Expiry
+    "name": "",  # Display name
+    "video": {  # LiveKit specific grants
+        "room": "",
+        "roomJoin": True,
+        "canPublish": True,
+        "canSubscribe": True,
+        "canUpdateOwnMetadata": True,
+    },
+}
+
+
+# Keys of the participant metadata, matching the tuple create_token takes
+META_KEYS = ("user_email", "user_id", "full_name")
 
 
 def create_token(
     identity: str,
     name: str,
     room: str,
-    metadata: dict = None,
+    metadata: Optional[tuple] = None,
     can_publish: bool = True,
     can_subscribe: bool = True,
     can_update_metadata: bool = True,
@@ -118,7 +270,7 @@ def create_token(
         identity: Unique user identifier
         name: Display name
         room: Room name to join
-        metadata: Additional metadata to include
+        metadata: (user_email, user_id, full_name) values, in META_KEYS order
         can_publish: Permission to publish media
         can_subscribe: Permission to subscribe to media
         can_update_metadata: Permission to update own metadata
@@ -126,48 +278,65 @@ def create_token(
     Returns:
         JWT token string
     """
-    # Token expiry
-    now = datetime.utcnow()
-    exp = now + timedelta(hours=TOKEN_EXPIRY_HOURS)
+    # Token expiry, in epoch seconds
+    now = int(time.time())
+    exp = now + TOKEN_EXPIRY_HOURS * 3600
     
-    # Build video grants
-    video_grants = {
-        "room": room,
-        "roomJoin": True,
-        "canPublish": can_publish,
-        "canSubscribe": can_subscribe,
-        "canUpdateOwnMetadata": can_update_metadata,
-    }
+    # Fill in the per-request fields; the rest comes from the template
+    video_grants = {**CLAIMS_TEMPLATE["video"], "room": room}
+    if not (can_publish and can_subscribe and can_update_metadata):
+        video_grants["canPublish"] = can_publish
+        video_grants["canSubscribe"] = can_subscribe
+        video_grants["canUpdateOwnMetadata"] = can_update_metadata
     
-    # Build JWT claims
-    claims = {
-        "iss": LIVEKIT_API_KEY,  # Issuer is the API key
-        "sub": identity,  # Subject is the user identity
-        "iat": int(now.timestamp()),  # Issued at
-        "nbf": int(now.timestamp()),  # Not before
-        "exp": int(exp.timestamp()),  # Expiry
-        "name": name,  # Display name
-        "video": video_grants,  # LiveKit specific grants
-    }
+    claims = CLAIMS_TEMPLATE.copy()
+    claims["sub"] = identity
+    claims["iat"] = now
+    claims["nbf"] = now
+    claims["exp"] = exp
+    claims["name"] = name
+    claims["video"] = video_grants
     
     # Add metadata if provided
     if metadata:
-        claims["metadata"] = str(metadata)  # LiveKit expects string metadata
+        # LiveKit expects a JSON string
+        claims["metadata"] = orjson.dumps(dict(zip(META_KEYS, metadata))).decode()
     
     # Sign and return the token
-    token = jwt.encode(claims, LIVEKIT_API_SECRET, algorithm="HS256")
-    return token
+    return encode_jwt(claims)
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "service": "LiveKit Token Server",
-        "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    # Let probes and proxies revalidate with If-None-Match; a 304 still
+    # confirms the server is up without sending the body
+    headers = {"ETag": HEALTH_ETAG, "Cache-Control": "public, max-age=1"}
+    if request.headers.get("if-none-match") == HEALTH_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=health_body, media_type="application/json", headers=headers)
+
+
+def issue_token(request: TokenRequest) -> TokenResponse:
+    """Create the token for a single token request."""
+    # Use provided room name or generate one
+    room_name = request.room_name or generate_room_name(request.user_email)
+    
+    # Generate token
+    token = create_token(
+        identity=request.user_id,
+        name=request.full_name,
+        room=room_name,
+        metadata=(request.user_email, request.user_id, request.full_name),
+        can_publish=True,  # Allow audio/video publishing
+        can_subscribe=True,  # Allow receiving audio/video
+        can_update_metadata=True,  # Allow updating own metadata
+    )
+    
+    logger.info("Token generated for user %s in room %s", request.user_id, room_name)
+    
+    # Both fields are strings we built ourselves, so skip re-validating them
+    return TokenResponse.model_construct(token=token, room_name=room_name)
 
 
 @app.post("/token", response_model=TokenResponse)
@@ -179,43 +348,63 @@ async def generate_token(request: TokenRequest):
     a LiveKit room with appropriate permissions.
     """
     try:
-        # Use provided room name or generate one
-        room_name = request.room_name or generate_room_name(request.user_email)
-        
-        # Create metadata
-        metadata = {
-            "user_email": request.user_email,
-            "user_id": request.user_id,
-            "full_name": request.full_name,
-        }
-        
-        # Generate token
-        token = create_token(
-            identity=request.user_id,
-            name=request.full_name,
-            room=room_name,
-            metadata=metadata,
-            can_publish=True,  # Allow audio/video publishing
-            can_subscribe=True,  # Allow receiving audio/video
-            can_update_metadata=True,  # Allow updating own metadata
-        )
-        
-        logger.info(f"Token generated for user {request.user_id} in room {room_name}")
-        
-        return TokenResponse(token=token, room_name=room_name)
+        return issue_token(request)
         
     except Exception as e:
-        logger.error(f"Token generation failed: {str(e)}")
+        logger.error("Token generation failed: %s", e)
         raise HTTPException(status_code=500, detail="Failed to generate token")
 
 
+@app.post("/token/batch", response_model=TokenBatchResponse)
+async def generate_tokens(
+    requests: Annotated[List[TokenRequest], Body(max_length=MAX_BATCH_SIZE)],
+    response: Response,
+):
+    """
+    Generate LiveKit JWT tokens for several users in one call.
+    
+    Saves a round trip per user when provisioning rooms in bulk. Tokens are
+    returned in request order; the X-Batch-Completed header reports how many
+    were generated, including when the batch fails part way.
+    """
+    tokens = []
+    try:
+        for request in requests:
+            tokens.append(issue_token(request))
+        
+    except Exception as e:
+        logger.error("Batch token generation failed after %d tokens: %s", len(tokens), e)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate tokens",
+            headers={"X-Batch-Completed": str(len(tokens))},
+        )
+    
+    response.headers["X-Batch-Completed"] = str(len(tokens))
+    return TokenBatchResponse(tokens=tokens)
+
+
 @app.post("/validate")
 async def validate_token(token: str):
     """
     Validate a LiveKit JWT token.
     
     This endpoint can be used to verify token validity and extract claims.
+    Tokens that verify are cached until they expire, so repeat checks of
+    the same token skip the signature verification.
     """
+    # Reject anything that can't be a JWT before hashing or verifying it
+    if token.count(".") != 2 or not MIN_TOKEN_LENGTH < len(token) < MAX_TOKEN_LENGTH:
+        return {
+            "valid": False,
+            "error": "Malformed token"
+        }
+    
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = validated_tokens.get(key)
+    if cached is not None:
+        return cached[1]
+    
     try:
         # Decode and validate the token
         claims = jwt.decode(
@@ -225,7 +414,7 @@ async def validate_token(token: str):
             options={"verify_exp": True}
         )
         
-        return {
+        result = {
             "valid": True,
             "identity": claims.get("sub"),
             "name": claims.get("name"),
@@ -233,7 +422,11 @@ async def validate_token(token: str):
             "expires_at": datetime.fromtimestamp(claims.get("exp", 0)).isoformat()
         }
         
-    except JWTError as e:
+        # Invalid tokens are never cached; tokens without exp aren't either
+        validated_tokens[key] = (claims.get("exp", 0), result)
+        return result
+        
+    except jwt.InvalidTokenError as e:
         return {
             "valid": False,
             "error": str(e)
@@ -243,8 +436,8 @@ async def validate_token(token: str):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unexpected errors."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "An internal error occurred"}
     )
@@ -253,10 +446,24 @@ async def global_exception_handler(request: Request, exc: Exception):
 if __name__ == "__main__":
     import uvicorn
     
-    uvicorn.run(
-        "token_server:app",
-        host="0.0.0.0",
-        port=PORT,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    if os.getenv("ENVIRONMENT") == "development":
+        # Auto-reload on code changes; reload runs a single process
+        uvicorn.run(
+            "token_server:app",
+            host="0.0.0.0",
+            port=PORT,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        # uvloop and httptools ship with uvicorn[standard]; fall back to the
+        # pure-Python loop and parser where they are unavailable (e.g. Windows)
+        uvicorn.run(
+            "token_server:app",
+            host="0.0.0.0",
+            port=PORT,
+            loop="uvloop" if find_spec("uvloop") else "asyncio",
+            http="httptools" if find_spec("httptools") else "h11",
+            workers=WORKERS,
+            log_level="info"
+        )
\ No newline at end of file